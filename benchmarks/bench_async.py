@@ -0,0 +1,99 @@
+"""Requests per second, sync WSGI vs the ASGI entry point, with slow Claude calls outstanding.
+
+Each mode serves the same mix: --ai requests for distinct queries (so nothing is
+coalesced or cached) against a stub client with --latency seconds per call, plus
+--reads hospital/scheme page reads. The WSGI side has --threads worker threads, as
+one threaded gunicorn worker would; the ASGI side is one event loop whose sync
+routes run on asgiref's thread pool.
+
+    python benchmarks/bench_async.py [--threads 8] [--ai 200] [--reads 200] [--latency 1.0]
+"""
+import argparse, asyncio, json, time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import AsyncStubAnthropic, StubAnthropic, load_app, percentiles
+
+READ_URLS = ('/api/hospitals?limit=20', '/api/schemes')
+
+
+def run_wsgi(health, args):
+    client = health.app.test_client()
+    read_latency = []
+
+    def ai(i):
+        client.post('/api/ai/disease', json={'query': f'wsgi query {i}'})
+
+    def read(i, queued):
+        client.get(READ_URLS[i % 2])
+        read_latency.append(time.perf_counter() - queued)  # includes the wait for a free thread
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        # AI calls arrive first, as in a health-scare spike; reads queue behind them for free threads
+        jobs = [pool.submit(ai, i) for i in range(args.ai)]
+        jobs += [pool.submit(read, i, time.perf_counter()) for i in range(args.reads)]
+        for job in jobs:
+            job.result()
+    return time.perf_counter() - started, read_latency
+
+
+async def asgi_call(health, method, path, body=None):
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+             'headers': [(b'host', b'bench'), (b'content-type', b'application/json')],
+             'client': ('127.0.0.1', 1), 'server': ('bench', 80)}
+    payload, sent = json.dumps(body).encode() if body is not None else b'', False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        pass
+
+    await health.asgi_app(scope, receive, send)
+
+
+async def run_asgi(health, args):
+    read_latency = []
+
+    async def read(i):
+        started = time.perf_counter()
+        await asgi_call(health, 'GET', READ_URLS[i % 2])
+        read_latency.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(asgi_call(health, 'POST', '/api/ai/disease', {'query': f'asgi query {i}'}) for i in range(args.ai)),
+                         *(read(i) for i in range(args.reads)))
+    return time.perf_counter() - started, read_latency
+
+
+def report(name, elapsed, read_latency, total):
+    p50, p99 = percentiles(read_latency, 50, 99)
+    print(f"{name:<14} {total / elapsed:8.1f} req/s   {elapsed:6.2f}s total   reads p50 {p50 * 1000:7.1f}ms  p99 {p99 * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+    parser.add_argument('--ai', type=int, default=200, help='AI requests, each a distinct query')
+    parser.add_argument('--reads', type=int, default=200, help='hospital/scheme page reads')
+    parser.add_argument('--latency', type=float, default=1.0, help='seconds per stub Claude call')
+    args = parser.parse_args()
+
+    health = load_app(ANTHROPIC_API_KEY='bench')
+    health.get_anthropic_client = lambda api_key: StubAnthropic(args.latency)
+    health.get_async_anthropic_client = lambda api_key: AsyncStubAnthropic(args.latency)
+    total = args.ai + args.reads
+
+    print(f"{args.ai} AI requests ({args.latency}s each upstream) + {args.reads} reads")
+    report(f"WSGI {args.threads} threads", *run_wsgi(health, args), total)
+    report("ASGI", *asyncio.run(run_asgi(health, args)), total)
+
+
+if __name__ == '__main__':
+    main()
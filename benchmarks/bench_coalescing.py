@@ -0,0 +1,41 @@
+"""Load test for /api/ai/disease request coalescing.
+
+Fires N concurrent requests for the same query (in different casing) at a stub
+Claude client with fixed latency, and reports how many upstream calls they made.
+
+    python benchmarks/bench_coalescing.py [--requests 50] [--latency 0.5]
+"""
+import argparse, threading, time
+
+from common import StubAnthropic, load_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds per stub Claude call')
+    args = parser.parse_args()
+
+    health = load_app(ANTHROPIC_API_KEY='bench')
+    stub = StubAnthropic(args.latency)
+    health.get_anthropic_client = lambda api_key: stub
+    sources = []
+
+    def ask(i):
+        query = ('Dengue fever', 'dengue FEVER', '  dengue fever ')[i % 3]
+        sources.append(health.app.test_client().post('/api/ai/disease', json={'query': query}).get_json()['source'])
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(args.requests)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.requests} concurrent identical requests -> {stub.calls} upstream call(s) "
+          f"in {elapsed:.2f}s ({sources.count('ai')} AI answers, {health.ai_inflight.coalesced} coalesced)")
+
+
+if __name__ == '__main__':
+    main()
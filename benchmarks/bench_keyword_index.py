@@ -0,0 +1,49 @@
+"""KeywordIndex micro-benchmark: match latency as the vocabulary grows.
+
+Builds indexes of random symptom-like terms and times matches() on chat-length
+queries, next to the `any(term in q ...)` scan it replaced.
+
+    python benchmarks/bench_keyword_index.py [--sizes 100 10000 50000] [--queries 1000]
+"""
+import argparse, random, string, time
+
+from common import load_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 50000])
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    health = load_app()
+    rng = random.Random(1)
+    word = lambda: ''.join(rng.choice(string.ascii_lowercase[:16]) for _ in range(rng.randint(3, 8)))
+    for size in args.sizes:
+        terms = [' '.join(word() for _ in range(rng.randint(1, 2))) for _ in range(size)]
+        index = health.KeywordIndex()
+        for rank, term in enumerate(terms):
+            index.add(term, rank, rank)
+        started = time.perf_counter()
+        index.build()
+        build = time.perf_counter() - started
+
+        # Ten-word messages, about a third of them quoting catalogued terms
+        queries = [' '.join(rng.choice(terms) if rng.random() < 0.3 else word() for _ in range(10))
+                   for _ in range(args.queries)]
+        started = time.perf_counter()
+        for query in queries:
+            index.matches(query)
+        matched = (time.perf_counter() - started) / len(queries)
+        sample = queries[:100]
+        started = time.perf_counter()
+        for query in sample:
+            [term for term in terms if term in query]
+        scanned = (time.perf_counter() - started) / len(sample)
+
+        print(f"{size:>7} terms: build {build * 1000:8.1f}ms   match {matched * 1e6:6.0f}us/query   "
+              f"linear scan {scanned * 1e6:8.0f}us/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Login load test: page-read latency while sign-ins hammer the password KDF.
+
+Starts the app on a local port (threaded werkzeug server) once per HASH_WORKERS
+setting, measures /api/hospitals and /api/schemes latency idle, then again while
+--clients threads log in as fast as they can. The rate limiter is opened up so
+every attempt reaches the hasher.
+
+    python benchmarks/bench_login.py [--workers 0 1 2] [--clients 16] [--reads 400]
+"""
+import argparse, json, os, signal, socket, subprocess, sys, tempfile, threading, time, urllib.error, urllib.request
+
+from common import ROOT, percentiles
+
+SERVER = """
+import logging, sys
+from werkzeug.serving import make_server
+import app
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+make_server('127.0.0.1', int(sys.argv[1]), app.app, threaded=True).serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def call(base, path, body=None):
+    request = urllib.request.Request(base + path, data=json.dumps(body).encode() if body is not None else None,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as r:
+            r.read()
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def read_latency(base, n):
+    samples = []
+    for i in range(n):
+        started = time.perf_counter()
+        call(base, '/api/schemes' if i % 2 else '/api/hospitals?limit=20')
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples, 50, 99)
+
+
+def run(workers, args):
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, DATABASE=os.path.join(tempfile.mkdtemp(prefix='health-bench-'), 'health.db'),
+               HASH_WORKERS=str(workers), BACKGROUND_JOBS='0', LOGIN_IP_PER_MINUTE='1000000',
+               LOGIN_MOBILE_PER_MINUTE='1000000')
+    env.pop('ANTHROPIC_API_KEY', None)
+    server = subprocess.Popen([sys.executable, '-c', SERVER, str(port)], cwd=ROOT, env=env)
+    try:
+        for _ in range(100):
+            try:
+                call(base, '/api/schemes')
+                break
+            except OSError:
+                time.sleep(0.2)
+        for i in range(8):
+            call(base, '/api/register', {'name': 'Bench', 'mobile': f'98765{i:05d}', 'password': 'secret123',
+                                         'confirm_password': 'secret123'})
+        idle = read_latency(base, args.reads)
+
+        stop, codes, lock = threading.Event(), {}, threading.Lock()
+
+        def hammer(i):
+            while not stop.is_set():
+                code = call(base, '/api/login', {'mobile': f'98765{i % 8:05d}', 'password': 'secret123'})
+                with lock:
+                    codes[code] = codes.get(code, 0) + 1
+
+        clients = [threading.Thread(target=hammer, args=(i,)) for i in range(args.clients)]
+        started = time.perf_counter()
+        for t in clients:
+            t.start()
+        time.sleep(1)
+        loaded = read_latency(base, args.reads)
+        stop.set()
+        for t in clients:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait()
+
+    print(f"HASH_WORKERS={workers}: reads idle p50/p99 {idle[0] * 1000:6.1f}/{idle[1] * 1000:6.1f}ms   "
+          f"under login load {loaded[0] * 1000:6.1f}/{loaded[1] * 1000:6.1f}ms   "
+          f"logins {sum(codes.values()) / elapsed:5.1f}/s {dict(sorted(codes.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2], help='HASH_WORKERS values to compare')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent login loops')
+    parser.add_argument('--reads', type=int, default=400)
+    args = parser.parse_args()
+    for workers in args.workers:
+        run(workers, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""k-nearest-hospital latency at 100k hospitals.
+
+Loads --hospitals random hospitals across India (about a third with an
+emergency department), then times nearest_hospitals() from random points, with
+and without the emergency filter, and spot-checks results against a full scan.
+
+    python benchmarks/bench_nearby.py [--hospitals 100000] [--queries 300] [-k 5]
+"""
+import argparse, random, time
+
+from common import load_app, percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hospitals', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    health = load_app()
+    rng = random.Random(1)
+    with health.app.app_context():
+        db = health.get_db()
+        rows = [(f"Bench {i}", 'Bench', rng.uniform(8, 35), rng.uniform(68, 97), int(rng.random() < 0.3))
+                for i in range(args.hospitals)]
+        started = time.perf_counter()
+        db.executemany("INSERT INTO hospitals (name, city, lat, lng, emergency) VALUES (?,?,?,?,?)", rows)
+        db.commit()
+        print(f"loaded {args.hospitals} hospitals in {time.perf_counter() - started:.1f}s")
+
+        points = [(rng.uniform(10, 33), rng.uniform(70, 95)) for _ in range(args.queries)]
+        everything = db.execute("SELECT id, lat, lng, emergency FROM hospitals WHERE lat IS NOT NULL").fetchall()
+        for label, filters in (('any hospital', ''), ('emergency only', ' AND hospitals.emergency = 1')):
+            timings = []
+            for lat, lng in points:
+                started = time.perf_counter()
+                health.nearest_hospitals(db, lat, lng, args.k, filters, (), 1000)
+                timings.append(time.perf_counter() - started)
+            exact = 0
+            for lat, lng in points[:20]:
+                hits = [r['id'] for _, r in health.nearest_hospitals(db, lat, lng, args.k, filters, (), 1000)]
+                scan = sorted((health.haversine_km(lat, lng, r['lat'], r['lng']), r['id']) for r in everything
+                              if r['emergency'] or not filters)
+                exact += hits == [i for _, i in scan[:args.k]]
+            p50, p99 = percentiles(timings, 50, 99)
+            print(f"k={args.k} {label:<15} p50 {p50 * 1000:5.2f}ms  p99 {p99 * 1000:5.2f}ms   "
+                  f"{exact}/20 identical to a full scan")
+
+
+if __name__ == '__main__':
+    main()
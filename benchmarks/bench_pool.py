@@ -0,0 +1,63 @@
+"""/api/hospitals latency under mixed read/write load, with and without the connection pool.
+
+--threads clients each send --requests requests: one in five books a token (a write),
+the rest read an uncached hospital page (page two, via the keyset cursor) or a
+hospital's detail. DB_POOL_SIZE=0 opens and closes a connection per request.
+
+    python benchmarks/bench_pool.py [--threads 8] [--requests 300]
+"""
+import argparse, threading, time
+
+from common import load_app, percentiles
+
+
+def run(health, args, pool_size):
+    health.app.config['DB_POOL_SIZE'] = pool_size
+    health.db_pool.close_all()
+    client = health.app.test_client()
+    cursor = client.get('/api/hospitals?limit=5').headers['X-Next-Cursor']
+    reads, writes, lock = [], [], threading.Lock()
+
+    def worker(n):
+        for i in range(n):
+            started = time.perf_counter()
+            if i % 5 == 0:
+                client.post('/api/tokens', json={'hospital_id': 1 + i % 12, 'session_id': 'bench'})
+                samples = writes
+            elif i % 2:
+                client.get(f'/api/hospitals?limit=5&cursor={cursor}')
+                samples = reads
+            else:
+                client.get(f'/api/hospitals/{1 + i % 40}')
+                samples = reads
+            with lock:
+                samples.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(args.requests,)) for _ in range(args.threads)]
+    opened = health.db_pool.opened
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    r50, r99 = percentiles(reads, 50, 99)
+    w50, w99 = percentiles(writes, 50, 99)
+    print(f"DB_POOL_SIZE={pool_size:<3} reads p50 {r50 * 1000:6.2f}ms p99 {r99 * 1000:6.2f}ms   "
+          f"writes p50 {w50 * 1000:6.2f}ms p99 {w99 * 1000:6.2f}ms   "
+          f"{(len(reads) + len(writes)) / elapsed:6.0f} req/s   {health.db_pool.opened - opened} connections opened")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=300, help='per thread')
+    args = parser.parse_args()
+
+    health = load_app(DETAIL_CACHE_TTL=0)  # every detail read goes to the database
+    for pool_size in (0, 8):
+        run(health, args, pool_size)
+
+
+if __name__ == '__main__':
+    main()
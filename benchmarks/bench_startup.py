@@ -0,0 +1,56 @@
+"""Worker boot time: the schema work done at import, before and after the version check.
+
+Boot: each sample is a fresh interpreter running `import app`, as a new gunicorn
+worker would, against a new and an already-migrated database. Schema step: the
+same work timed in-process, without interpreter noise. ensure_schema() is what
+every boot now does; init_db() (DDL, column probes, seed checks) is what every
+import used to do.
+
+    python benchmarks/bench_startup.py [--runs 7] [--repeat 50]
+"""
+import argparse, os, statistics, subprocess, sys, time
+
+from common import ROOT, load_app
+
+
+def boot(database, code='import app'):
+    env = dict(os.environ, DATABASE=database, BACKGROUND_JOBS='0')
+    env.pop('ANTHROPIC_API_KEY', None)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True)
+    return time.perf_counter() - started
+
+
+def timed(fn, runs):
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, min(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7, help='interpreter boots per case')
+    parser.add_argument('--repeat', type=int, default=50, help='in-process schema steps per case')
+    args = parser.parse_args()
+
+    health = load_app()  # migrates and seeds a scratch database
+    current = health.app.config['DATABASE']
+    scratch = os.path.dirname(current)
+
+    print("boot (fresh interpreter)")
+    for label, fn in (('new database: migrate + seed', lambda i: boot(os.path.join(scratch, f'new{i}.db'))),
+                      ('migrated database', lambda i: boot(current)),
+                      ('imports only, no app', lambda i: boot(current, 'import flask, numpy, werkzeug.security')),):
+        print("  {:<32} median {:7.1f}ms   min {:7.1f}ms".format(label, *timed(fn, args.runs)))
+
+    print("schema step (in-process, migrated database)")
+    for label, fn in (('now: ensure_schema()', lambda i: health.ensure_schema()),
+                      ('before: init_db()', lambda i: health.init_db())):
+        print("  {:<32} median {:7.2f}ms   min {:7.2f}ms".format(label, *timed(fn, args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
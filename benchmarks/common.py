@@ -0,0 +1,59 @@
+"""Shared setup for the benchmark scripts: a scratch database and quiet background jobs.
+
+app.py reads its settings at import, so call load_app() before anything touches it.
+"""
+import json, os, sys, tempfile, threading, time, types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(**env):
+    """Import app against a fresh database in a temp directory; env overrides the defaults"""
+    scratch = tempfile.mkdtemp(prefix='health-bench-')
+    settings = {'DATABASE': os.path.join(scratch, 'health.db'), 'BACKGROUND_JOBS': '0', 'QUEUE_SIM_SECONDS': '0',
+                'ARCHIVE_DIR': '', 'KNOWLEDGE_FILE': os.path.join(scratch, 'knowledge.json'),
+                'LOGIN_IP_PER_MINUTE': '1000000', 'LOGIN_MOBILE_PER_MINUTE': '1000000'}
+    settings.update({k: str(v) for k, v in env.items()})
+    os.environ.update(settings)
+    if 'ANTHROPIC_API_KEY' not in env:
+        os.environ.pop('ANTHROPIC_API_KEY', None)
+    sys.path.insert(0, ROOT)
+    import app
+    return app
+
+
+def percentiles(samples, *points):
+    """Values at the given percentiles (0-100) of a list of samples"""
+    ordered = sorted(samples)
+    return [ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points]
+
+
+STUB_ANSWER = json.dumps({'title': 'Stub', 'description': 'd', 'dos': [], 'donts': [], 'food': [],
+                          'prevention': [], 'specialist': 'General Physician', 'emergency': False})
+
+
+class StubAnthropic:
+    """Stands in for anthropic.Anthropic / AsyncAnthropic: fixed latency, counts upstream calls"""
+
+    def __init__(self, latency=0.2):
+        self.api_key = 'bench'
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.messages = self
+
+    def _reply(self):
+        with self._lock:
+            self.calls += 1
+        return types.SimpleNamespace(content=[types.SimpleNamespace(text=STUB_ANSWER)])
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return self._reply()
+
+
+class AsyncStubAnthropic(StubAnthropic):
+    async def create(self, **kwargs):
+        import asyncio
+        await asyncio.sleep(self.latency)
+        return self._reply()
@@ -0,0 +1,20 @@
+"""Password hashing run inside the worker processes of app.PasswordHasher.
+
+The jobs sent to a worker are functions from this module, so unpickling them
+loads only this file and werkzeug. Keep it free of import-time side effects.
+"""
+import os
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+def lower_priority(niceness):
+    """Worker initializer: let the web process win the CPU when both want it"""
+    os.nice(niceness)
+
+
+def hash_password(password):
+    return generate_password_hash(password)
+
+
+def verify_password(password_hash, password):
+    return check_password_hash(password_hash, password)
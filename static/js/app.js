@@ -19,10 +19,12 @@ const App = (() => {
     sessionId: null,
     user: null,                // logged in user info
     hospitals: [],
+    hospitalParams: {},
+    hospitalsCursor: null,     // X-Next-Cursor of the last hospital page
     currentHospital: null,
     currentHospitalSchemes: [],
     token: null,
-    queueInterval: null,
+    queueStream: null,
     specFilter: '',
     schemeFilter: 'all',
     loginMode: 'password',
@@ -106,14 +108,20 @@ const App = (() => {
 
   // ── Init ────────────────────────────────────────────────────────────────
   async function init() {
+    // One request for user, cities, hospitals and schemes, in flight while the splash plays
+    const boot = fetchBootstrap();
     await playSplash();
 
     // Generate or load session ID
     state.sessionId = localStorage.getItem('hn_session_id') || generateId();
     localStorage.setItem('hn_session_id', state.sessionId);
 
-    // attempt to fetch current user
-    await fetchCurrentUser();
+    const data = await boot;
+    if (data) {
+      state.user = data.user || null;
+    } else {
+      await fetchCurrentUser();
+    }
     updateAuthNav();
 
     // Restore token from storage
@@ -122,14 +130,20 @@ const App = (() => {
       try { state.token = JSON.parse(savedToken); } catch(e) {}
     }
 
-    loadCities();
-    loadHospitals();
+    if (data) {
+      renderCities(data.cities);
+      showHospitals(data.hospitals.items, data.hospitals.next_cursor, {});
+      showAllSchemes(data.schemes);
+    } else {
+      loadCities();
+      loadHospitals();
+      loadAllSchemes();
+    }
     renderRecentSearches();
-    loadAllSchemes();
 
-    // If there's an active token, start status polling
+    // If there's an active token, subscribe to queue updates
     if (state.token) {
-      startQueuePolling();
+      startQueueUpdates();
     }
 
     // Mark token nav if token exists
@@ -209,6 +223,14 @@ const App = (() => {
     toast(`Language changed`);
   }
 
+  async function fetchBootstrap() {
+    try {
+      const resp = await fetch('/api/bootstrap?' + new URLSearchParams({ fields: HOSPITAL_CARD_FIELDS }).toString());
+      if (!resp.ok) return null;
+      return await resp.json();
+    } catch(e) { return null; }
+  }
+
   // ── Authentication ──────────────────────────────────────────────────────
   async function fetchCurrentUser() {
     try {
@@ -379,13 +401,33 @@ const App = (() => {
     document.getElementById('disease-result').classList.add('hidden');
 
     try {
-      const resp = await fetch('/api/ai/disease', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ query, session_id: state.sessionId })
+      // Stream the answer so description, do's and don'ts fill in as Claude writes them
+      let buffer = '';
+      let done = false;
+      const city = document.getElementById('city-filter')?.value || '';
+      const streamed = await streamEvents('/api/ai/disease/stream', { query, city, session_id: state.sessionId }, (event, data) => {
+        if (event === 'delta') {
+          buffer += data.text || '';
+          const partial = parsePartialJson(buffer);
+          if (partial) {
+            renderDiseaseResult(partial);
+            setSearchLoading(false);
+          }
+        } else if (event === 'result' && data.data) {
+          renderDiseaseResult(data.data);
+          done = true;
+        }
       });
-      const json = await resp.json();
-      if (json.data) renderDiseaseResult(json.data);
+      if (!streamed || !done) {
+        // The stream request already recorded this search; an 'error' event also lands here
+        const resp = await fetch('/api/ai/disease', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ query, city, session_id: state.sessionId, record: false })
+        });
+        const json = await resp.json();
+        if (json.data) renderDiseaseResult(json.data);
+      }
     } catch(e) {
       toast('Could not fetch result. Check connection.');
     } finally {
@@ -393,6 +435,91 @@ const App = (() => {
     }
   }
 
+  // ── Streaming helpers ─────────────────────────────────────────────────────
+  // POSTs JSON and feeds each server-sent event to onEvent(name, data).
+  // Returns false when the browser cannot read response streams.
+  async function streamEvents(url, body, onEvent) {
+    const resp = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+      body: JSON.stringify(body)
+    });
+    if (!resp.ok || !resp.body || !resp.body.getReader) return false;
+
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      pending += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = pending.indexOf('\n\n')) !== -1) {
+        const raw = pending.slice(0, sep);
+        pending = pending.slice(sep + 2);
+        let event = 'message', data = '';
+        raw.split('\n').forEach(line => {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        try { onEvent(event, data ? JSON.parse(data) : {}); } catch(e) {}
+      }
+    }
+    return true;
+  }
+
+  // Parses the longest usable prefix of a JSON object that is still being
+  // streamed: complete fields and array items, plus a trailing unfinished
+  // string value so long descriptions appear word by word.
+  function parsePartialJson(text) {
+    const start = text.indexOf('{');
+    if (start === -1) return null;
+
+    const stack = [];
+    let inStr = false, esc = false, isKey = false;
+    let safeEnd = -1, safeStack = [];
+    const markSafe = i => { safeEnd = i; safeStack = stack.map(f => f.type); };
+    const closers = types => types.slice().reverse().map(t => t === '{' ? '}' : ']').join('');
+
+    for (let i = start; i < text.length; i++) {
+      const ch = text[i];
+      if (inStr) {
+        if (esc) esc = false;
+        else if (ch === '\\') esc = true;
+        else if (ch === '"') { inStr = false; if (!isKey) markSafe(i); }
+        continue;
+      }
+      const top = stack[stack.length - 1];
+      if (ch === '"') {
+        inStr = true;
+        isKey = !!top && top.type === '{' && top.expectKey;
+      } else if (ch === '{' || ch === '[') {
+        stack.push({ type: ch, expectKey: ch === '{' });
+      } else if (ch === '}' || ch === ']') {
+        stack.pop();
+        markSafe(i);
+        if (!stack.length) break;
+      } else if (ch === ':') {
+        if (top) top.expectKey = false;
+      } else if (ch === ',') {
+        if (top && top.type === '{') top.expectKey = true;
+      } else if (/[\d\w.-]/.test(ch) && top && !top.expectKey && /[,\]}\s]/.test(text[i + 1] || '')) {
+        markSafe(i); // end of a number / true / false / null
+      }
+    }
+
+    const attempts = [];
+    if (inStr && !isKey) {
+      const body = esc ? text.slice(start, -1) : text.slice(start);
+      attempts.push(body + '"' + closers(stack.map(f => f.type)));
+    }
+    if (safeEnd !== -1) attempts.push(text.slice(start, safeEnd + 1) + closers(safeStack));
+    for (const candidate of attempts) {
+      try { return JSON.parse(candidate); } catch(e) {}
+    }
+    return null;
+  }
+
   function setSearchLoading(on) {
     const btn = document.getElementById('search-btn');
     const txt = document.getElementById('search-btn-text');
@@ -501,14 +628,23 @@ const App = (() => {
     if (btn) btn.disabled = true;
 
     try {
-      const resp = await fetch('/api/ai/chat', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ query })
+      let botMsg = null;
+      const streamed = await streamEvents('/api/ai/chat/stream', { query }, (event, data) => {
+        if (event === 'delta' && data.text) {
+          if (!botMsg) botMsg = appendChatMessage('bot', '');
+          botMsg.textContent += data.text;
+        }
       });
-      const json = await resp.json();
-      const reply = json.reply || 'Please share a bit more detail, and I will guide you.';
-      appendChatMessage('bot', reply);
+      if (!streamed || !botMsg) {
+        const resp = await fetch('/api/ai/chat', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ query })
+        });
+        const json = await resp.json();
+        const reply = json.reply || 'Please share a bit more detail, and I will guide you.';
+        appendChatMessage('bot', reply);
+      }
     } catch (e) {
       appendChatMessage('bot', 'Could not respond now. Please try again in a moment.');
     } finally {
@@ -524,6 +660,7 @@ const App = (() => {
     msg.textContent = text;
     wrap.appendChild(msg);
     wrap.scrollTop = wrap.scrollHeight;
+    return msg;
   }
 
   function renderDiseaseResult(data) {
@@ -546,13 +683,13 @@ const App = (() => {
 
     // Food
     const foodEl = document.getElementById('res-food');
-    foodEl.innerHTML = (data.food || []).map(f =>
+    foodEl.innerHTML = (data.food || []).filter(f => f && f.text).map(f =>
       `<div class="ls-item"><span class="ls-ico">${f.icon}</span><p>${f.text}</p></div>`
     ).join('');
 
     // Prevention
     const prevEl = document.getElementById('res-prevention');
-    prevEl.innerHTML = (data.prevention || []).map(p =>
+    prevEl.innerHTML = (data.prevention || []).filter(p => p && p.text).map(p =>
       `<div class="ls-item"><span class="ls-ico">${p.icon}</span><p>${p.text}</p></div>`
     ).join('');
 
@@ -570,31 +707,49 @@ const App = (() => {
   async function loadCities() {
     try {
       const resp = await fetch('/api/cities');
-      const cities = await resp.json();
-      const cityFilter = document.getElementById('city-filter');
-      const qaLocationFilter = document.getElementById('qa-location-filter');
+      renderCities(await resp.json());
+    } catch(e) {}
+  }
+
+  function renderCities(cities) {
+    const cityFilter = document.getElementById('city-filter');
+    const qaLocationFilter = document.getElementById('qa-location-filter');
+    if (cityFilter) {
+      cityFilter.innerHTML = '<option value="">All Cities</option>';
+    }
+    if (qaLocationFilter) {
+      qaLocationFilter.innerHTML = '<option value="">All Locations</option>';
+    }
+
+    (cities || []).forEach(c => {
       if (cityFilter) {
-        cityFilter.innerHTML = '<option value="">All Cities</option>';
+        const opt = document.createElement('option');
+        opt.value = c;
+        opt.textContent = c;
+        cityFilter.appendChild(opt);
       }
       if (qaLocationFilter) {
-        qaLocationFilter.innerHTML = '<option value="">All Locations</option>';
+        const qaOpt = document.createElement('option');
+        qaOpt.value = c;
+        qaOpt.textContent = c;
+        qaLocationFilter.appendChild(qaOpt);
       }
+    });
+  }
 
-      (cities || []).forEach(c => {
-        if (cityFilter) {
-          const opt = document.createElement('option');
-          opt.value = c;
-          opt.textContent = c;
-          cityFilter.appendChild(opt);
-        }
-        if (qaLocationFilter) {
-          const qaOpt = document.createElement('option');
-          qaOpt.value = c;
-          qaOpt.textContent = c;
-          qaLocationFilter.appendChild(qaOpt);
-        }
-      });
-    } catch(e) {}
+  // Only the columns renderHospitalCard needs; the API pages results with a cursor
+  const HOSPITAL_CARD_FIELDS = 'id,name,icon,city,specialization,rating,beds,emergency,aarogyasri,ayushman';
+
+  async function fetchHospitalPage(params, cursor) {
+    const query = { ...params, fields: HOSPITAL_CARD_FIELDS };
+    if (cursor) query.cursor = cursor;
+    else if (query.search) query.session_id = state.sessionId;  // counted towards trending searches
+    const resp = await fetch('/api/hospitals?' + new URLSearchParams(query).toString());
+    return { hospitals: await resp.json(), next: resp.headers.get('X-Next-Cursor') };
+  }
+
+  function updateMoreButton() {
+    document.getElementById('hospitals-more').classList.toggle('hidden', !state.hospitalsCursor);
   }
 
   async function loadHospitals(params = {}) {
@@ -604,29 +759,55 @@ const App = (() => {
     listEl.innerHTML = '';
     loadingEl.classList.remove('hidden');
     emptyEl.classList.add('hidden');
+    state.hospitalsCursor = null;
+    updateMoreButton();
 
-    const qs = new URLSearchParams(params).toString();
     try {
-      const resp = await fetch('/api/hospitals' + (qs ? '?' + qs : ''));
-      const hospitals = await resp.json();
-      state.hospitals = hospitals;
+      const { hospitals, next } = await fetchHospitalPage(params);
+      showHospitals(hospitals, next, params);
+    } catch(e) {
       loadingEl.classList.add('hidden');
+      listEl.innerHTML = '<div class="empty-state"><div class="empty-icon">⚠️</div><p>Could not load hospitals.</p></div>';
+    }
+  }
 
-      if (!hospitals.length) {
-        emptyEl.classList.remove('hidden');
-        return;
-      }
-      listEl.innerHTML = hospitals.map(h => renderHospitalCard(h)).join('');
+  function showHospitals(hospitals, next, params) {
+    const listEl = document.getElementById('hospital-list');
+    state.hospitals = hospitals;
+    state.hospitalParams = params;
+    state.hospitalsCursor = next;
+    document.getElementById('hospitals-loading').classList.add('hidden');
+    updateMoreButton();
+
+    if (!hospitals.length) {
+      listEl.innerHTML = '';
+      document.getElementById('hospitals-empty').classList.remove('hidden');
+      return;
+    }
+    listEl.innerHTML = hospitals.map(h => renderHospitalCard(h)).join('');
 
-      // Also render token hospital list (subset)
-      const tokList = document.getElementById('token-hosp-list');
-      if (tokList) {
-        tokList.innerHTML = hospitals.slice(0, 8).map(h => renderHospitalCard(h, 'token')).join('');
-      }
+    // Also render token hospital list (subset)
+    const tokList = document.getElementById('token-hosp-list');
+    if (tokList) {
+      tokList.innerHTML = hospitals.slice(0, 8).map(h => renderHospitalCard(h, 'token')).join('');
+    }
+  }
+
+  async function loadMoreHospitals() {
+    if (!state.hospitalsCursor) return;
+    const cursor = state.hospitalsCursor;
+    state.hospitalsCursor = null;
+    updateMoreButton();
+    try {
+      const { hospitals, next } = await fetchHospitalPage(state.hospitalParams || {}, cursor);
+      state.hospitals = state.hospitals.concat(hospitals);
+      state.hospitalsCursor = next;
+      document.getElementById('hospital-list').insertAdjacentHTML('beforeend', hospitals.map(h => renderHospitalCard(h)).join(''));
     } catch(e) {
-      loadingEl.classList.add('hidden');
-      listEl.innerHTML = '<div class="empty-state"><div class="empty-icon">⚠️</div><p>Could not load hospitals.</p></div>';
+      state.hospitalsCursor = cursor;
+      toast('Could not load more hospitals.');
     }
+    updateMoreButton();
   }
 
   function renderHospitalCard(h, mode) {
@@ -681,6 +862,13 @@ const App = (() => {
     loadHospitals(params);
   }
 
+  let hospitalSearchTimer = null;
+  function searchHospitals() {
+    // Wait for a pause in typing so every keystroke is not a request (and a recorded search)
+    clearTimeout(hospitalSearchTimer);
+    hospitalSearchTimer = setTimeout(filterHospitals, 300);
+  }
+
   function filterSpec(spec, btn) {
     state.specFilter = spec;
     document.querySelectorAll('.spec-btn').forEach(b => b.classList.remove('active'));
@@ -829,7 +1017,7 @@ const App = (() => {
       updateTokenNav();
       navTo('token');
       renderActiveToken();
-      startQueuePolling();
+      startQueueUpdates();
       toast(`Token ${data.token} booked for ${data.hospital_name}!`);
     } catch(e) {
       toast('Could not book token. Try again.');
@@ -849,9 +1037,8 @@ const App = (() => {
   function updateQueueDisplay(ahead, wait) {
     document.getElementById('tok-ahead').textContent = ahead;
     document.getElementById('tok-wait').textContent = `~${wait} min`;
-    const currentNum = state.token ? parseInt(state.token.token.slice(1)) - ahead - 1 : 0;
-    const letter = state.token ? state.token.token[0] : 'A';
-    document.getElementById('tok-current').textContent = `${letter}${Math.max(1, currentNum)}`;
+    document.getElementById('tok-current').textContent = (state.token && state.token.current_token) || '—';
+    const status = state.token && state.token.status;
 
     const totalSlots = 20;
     const progress = Math.max(5, Math.round(100 - (ahead / totalSlots * 100)));
@@ -860,7 +1047,7 @@ const App = (() => {
     const alertEl = document.getElementById('tok-alert');
     const statusEl = document.getElementById('tok-status-text');
 
-    if (ahead === 0) {
+    if (status === 'your_turn' || status === 'served') {
       alertEl.className = 'tok-alert-box success';
       alertEl.innerHTML = `<i class="fa-solid fa-circle-check"></i> <div><strong>🎉 Your turn now!</strong> Please proceed to the counter immediately.</div>`;
       statusEl.textContent = 'IT IS YOUR TURN — GO NOW!';
@@ -876,39 +1063,48 @@ const App = (() => {
     }
   }
 
-  function startQueuePolling() {
-    if (state.queueInterval) clearInterval(state.queueInterval);
-    if (!state.token) return;
+  function stopQueueUpdates() {
+    if (state.queueStream) { state.queueStream.close(); state.queueStream = null; }
+  }
 
-    state.queueInterval = setInterval(async () => {
-      if (!state.token) { clearInterval(state.queueInterval); return; }
-      try {
-        const resp = await fetch(`/api/tokens/${state.token.token}/status`);
-        const data = await resp.json();
-        if (data.people_ahead !== undefined) {
-          state.token.people_ahead = data.people_ahead;
-          state.token.estimated_wait = data.estimated_wait;
-          localStorage.setItem('hn_token', JSON.stringify(state.token));
-
-          // Update UI if on token page
-          if (state.currentPage === 'token') {
-            updateQueueDisplay(data.people_ahead, data.estimated_wait);
-          }
+  function applyQueueStatus(data) {
+    if (!state.token || data.people_ahead === undefined) return;
+    const wasAhead = state.token.people_ahead;
+    state.token.people_ahead = data.people_ahead;
+    state.token.estimated_wait = data.estimated_wait;
+    state.token.status = data.status;
+    state.token.current_token = data.current_token;
+    localStorage.setItem('hn_token', JSON.stringify(state.token));
+
+    // Update UI if on token page
+    if (state.currentPage === 'token') {
+      updateQueueDisplay(data.people_ahead, data.estimated_wait);
+    }
 
-          // Toast alert when close
-          if (data.people_ahead === 3) {
-            toast(`⚠️ Only 3 patients ahead for token ${state.token.token}!`);
-          } else if (data.people_ahead === 0) {
-            toast(`🎉 Your turn now! Token ${state.token.token}`);
-            clearInterval(state.queueInterval);
-          }
-        }
-      } catch(e) {}
-    }, 15000); // poll every 15s
+    // Toast alert when close
+    if (data.status === 'your_turn') {
+      toast(`🎉 Your turn now! Token ${state.token.token}`);
+      stopQueueUpdates();
+    } else if (data.people_ahead === 3 && wasAhead !== 3) {
+      toast(`⚠️ Only 3 patients ahead for token ${state.token.token}!`);
+    }
+  }
+
+  function startQueueUpdates() {
+    stopQueueUpdates();
+    if (!state.token) return;
+
+    // The server pushes a status event whenever this hospital's queue moves
+    const source = new EventSource(`/api/tokens/${encodeURIComponent(state.token.token)}/events`);
+    source.addEventListener('status', (e) => {
+      try { applyQueueStatus(JSON.parse(e.data)); } catch(err) {}
+    });
+    source.addEventListener('end', stopQueueUpdates);  // stop EventSource from reconnecting
+    state.queueStream = source;
   }
 
   function cancelToken() {
-    if (state.queueInterval) clearInterval(state.queueInterval);
+    stopQueueUpdates();
     state.token = null;
     localStorage.removeItem('hn_token');
     document.getElementById('token-active').classList.add('hidden');
@@ -932,12 +1128,15 @@ const App = (() => {
   async function loadAllSchemes() {
     try {
       const resp = await fetch('/api/schemes');
-      const schemes = await resp.json();
-      state.allSchemes = schemes;
-      renderAllSchemes(state.schemeFilter || 'all');
+      showAllSchemes(await resp.json());
     } catch(e) {}
   }
 
+  function showAllSchemes(schemes) {
+    state.allSchemes = schemes;
+    renderAllSchemes(state.schemeFilter || 'all');
+  }
+
   function renderAllSchemes(cat) {
     const schemes = state.allSchemes || [];
     const query = (document.getElementById('schemes-search')?.value || '').trim().toLowerCase();
@@ -1007,6 +1206,26 @@ const App = (() => {
   // ── Emergency ─────────────────────────────────────────────────────────────
   function openEmergency() {
     document.getElementById('emg-overlay').classList.add('open');
+    loadNearbyEmergency();
+  }
+
+  function loadNearbyEmergency() {
+    const el = document.getElementById('emg-nearby');
+    if (!el || !navigator.geolocation) return;
+    navigator.geolocation.getCurrentPosition(async (pos) => {
+      try {
+        const { latitude, longitude } = pos.coords;
+        const resp = await fetch(`/api/hospitals/nearby?lat=${latitude}&lng=${longitude}&k=3&emergency=1`);
+        const hospitals = await resp.json();
+        if (!Array.isArray(hospitals) || !hospitals.length) { el.innerHTML = ''; return; }
+        el.innerHTML = '<h3><i class="fa-solid fa-truck-medical"></i> Nearest 24×7 Emergency</h3>' +
+          hospitals.map(h => `
+            <div class="emg-near-item" onclick="App.closeEmergency();App.openHospital(${h.id})">
+              <span>${h.name}<br><small>${h.address || h.city}</small></span>
+              <span class="dist">${h.distance_km} km</span>
+            </div>`).join('');
+      } catch(e) { el.innerHTML = ''; }
+    }, () => { el.innerHTML = ''; }, { timeout: 8000, maximumAge: 300000 });
   }
   function closeEmergency() {
     document.getElementById('emg-overlay').classList.remove('open');
@@ -1029,7 +1248,7 @@ const App = (() => {
     showLogin, showSignup, setLoginMode, requestOtp, login, signup, logout,
     searchDisease, quickSearch, quickActionDiseaseSearch, quickActionHospitalSearch, quickActionHealthAdvice, searchHealthAdvice, findHospitalsForDisease,
     askStarterQuestion, sendChatMessage,
-    filterHospitals, filterSpec,
+    filterHospitals, searchHospitals, filterSpec, loadMoreHospitals,
     openHospital, switchTab, filterSchemesCat, bookTokenForCurrent,
     bookTokenById, cancelToken,
     openEmergency, closeEmergency,
@@ -0,0 +1,84 @@
+"""Shared fixtures. app.py configures itself from the environment at import, so the
+test settings are exported before it is imported.
+
+PostgreSQL runs are opt-in: point TEST_DATABASE_URL at a throwaway database
+(its state tables are dropped before every test), e.g.
+    TEST_DATABASE_URL=postgresql://postgres@localhost/health_test python -m pytest tests
+"""
+import os, sys, tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_scratch = tempfile.mkdtemp(prefix='health-tests-')
+os.environ.update(
+    DATABASE=os.path.join(_scratch, 'import.db'),
+    KNOWLEDGE_FILE=os.path.join(_scratch, 'knowledge.json'),
+    ARCHIVE_DIR='',
+    DB_ENGINE='sqlite',
+    BACKGROUND_JOBS='0',
+    QUEUE_SIM_SECONDS='0',
+    QUEUE_STAFF_KEY='test-staff-key',
+    HASH_WORKERS='0',
+    LOGIN_IP_PER_MINUTE='100000',
+    LOGIN_MOBILE_PER_MINUTE='100000',
+)
+os.environ.pop('ANTHROPIC_API_KEY', None)
+
+import app as health  # noqa: E402
+
+PG_URL = os.environ.get('TEST_DATABASE_URL', '')
+ENGINES = ['sqlite', pytest.param('postgres', marks=pytest.mark.skipif(not PG_URL, reason='TEST_DATABASE_URL not set'))]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A freshly migrated and seeded SQLite database for this test"""
+    original = health.app.config['DATABASE']
+    health.app.config['DATABASE'] = path = str(tmp_path / 'health.db')
+    health.init_db()
+    yield path
+    health.db_pool.close_all(path)
+    health.app.config['DATABASE'] = original
+
+
+@pytest.fixture
+def client(database):
+    return health.app.test_client()
+
+
+def reset_postgres(url):
+    import psycopg
+    with psycopg.connect(url, autocommit=True) as conn:
+        for table in health.PostgresEngine.TABLES:
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request, database, monkeypatch):
+    """The shared-state engine under test, wired into the app's repositories and queue engine.
+
+    The catalogue (hospitals, schemes) is read from the per-test SQLite database on both;
+    on postgres, imports reach it through the shared catalog_log.
+    """
+    if request.param == 'sqlite':
+        engine = health.SQLiteEngine()
+    else:
+        pytest.importorskip('psycopg_pool')
+        reset_postgres(PG_URL)
+        engine = health.PostgresEngine(PG_URL, 4)
+        engine.migrate()
+    monkeypatch.setattr(health, 'state_engine', engine)
+    monkeypatch.setattr(health, 'user_repo', health.UserRepository(engine))
+    monkeypatch.setattr(health, 'token_repo', health.TokenRepository(engine))
+    monkeypatch.setattr(health, 'history_repo', health.SearchHistoryRepository(engine))
+    monkeypatch.setattr(health, 'queue_engine', health.QueueEngine(health.token_repo, 0, health.WaitEstimator(0.2), 0))
+    monkeypatch.setattr(health.retention, 'engine', engine)
+    monkeypatch.setattr(health.search_analytics, 'repo', health.history_repo)
+    monkeypatch.setattr(health.ai_cache, 'repo', health.AICacheRepository(engine))
+    monkeypatch.setattr(health.catalog_replica, 'repo', health.CatalogLogRepository(engine))
+    yield engine
+    if request.param == 'postgres':
+        engine.close()
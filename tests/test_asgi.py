@@ -0,0 +1,305 @@
+"""The ASGI entry point and AsyncSingleFlight (driven with plain ASGI messages, no server)"""
+import asyncio, contextlib, json, threading, time, types
+
+import pytest
+
+from conftest import health
+from test_coalescing import ANSWER
+from test_streaming import parse_sse
+
+
+class AsyncStubClient:
+    api_key = 'test'
+
+    def __init__(self, latency=0.3, fail_at=None):
+        self.latency = latency
+        self.fail_at = fail_at
+        self.calls = 0
+        self.messages = self
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return types.SimpleNamespace(content=[types.SimpleNamespace(text=ANSWER)])
+
+    @contextlib.asynccontextmanager
+    async def stream(self, **kwargs):
+        self.calls += 1
+        yield types.SimpleNamespace(text_stream=self._pieces())
+
+    async def _pieces(self):
+        for i, piece in enumerate((ANSWER[:40], ANSWER[40:])):
+            if i == self.fail_at:
+                raise RuntimeError('connection reset')
+            await asyncio.sleep(self.latency / 2)
+            yield piece
+
+
+def http_scope(method, path):
+    path, _, query = path.partition('?')
+    return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method, 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'test'), (b'content-type', b'application/json')],
+            'client': ('127.0.0.1', 1234), 'server': ('test', 80)}
+
+
+async def asgi_request(method, path, body=None):
+    """(status, parsed JSON body) for one request to app.asgi_app"""
+    status, text = await asgi_text(method, path, body)
+    return status, json.loads(text)
+
+
+async def asgi_text(method, path, body=None):
+    """(status, body text) for one request to app.asgi_app"""
+    scope = http_scope(method, path)
+    payload = json.dumps(body).encode() if body is not None else b''
+    sent, messages = False, []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {'type': 'http.request', 'body': payload, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await health.asgi_app(scope, receive, send)
+    status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+    return status, b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body').decode()
+
+
+@pytest.fixture
+def stub(client, monkeypatch):
+    stub = AsyncStubClient()
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(health, 'get_async_anthropic_client', lambda api_key: stub)
+    return stub
+
+
+def test_followers_share_one_call():
+    async def scenario():
+        flight, calls = health.AsyncSingleFlight(), []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'answer'
+
+        results = await asyncio.gather(*(flight.do('k', slow) for _ in range(10)))
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert len(calls) == 1 and results == ['answer'] * 10
+
+
+def test_followers_retry_when_the_leader_is_cancelled():
+    async def scenario():
+        flight, started = health.AsyncSingleFlight(), asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            return 'answer'
+
+        leader = asyncio.create_task(flight.do('k', slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do('k', slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.wait_for(follower, 1)
+
+    assert asyncio.run(scenario()) == 'answer'
+
+
+def test_followers_wake_when_the_leader_dies_of_a_base_exception():
+    class Abort(BaseException):
+        pass
+
+    async def scenario():
+        flight, started = health.AsyncSingleFlight(), asyncio.Event()
+
+        async def dying():
+            started.set()
+            await asyncio.sleep(0.05)
+            raise Abort()
+
+        leader = asyncio.create_task(flight.do('k', dying))
+        await started.wait()
+        follower = asyncio.create_task(flight.do('k', lambda: asyncio.sleep(0, 'retried')))
+        with pytest.raises(Abort):
+            await leader
+        return await asyncio.wait_for(follower, 1)
+
+    assert asyncio.run(scenario()) == 'retried'
+
+
+def test_reads_are_served_while_ai_calls_are_outstanding(stub):
+    async def scenario():
+        ai = [asyncio.create_task(asgi_request('POST', '/api/ai/disease', {'query': f'async query {i}'}))
+              for i in range(50)]
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        reads = await asyncio.gather(asgi_request('GET', '/api/schemes'), asgi_request('GET', '/api/hospitals?limit=5'))
+        read_seconds = time.perf_counter() - started
+        return await asyncio.gather(*ai), reads, read_seconds
+
+    answers, reads, read_seconds = asyncio.run(scenario())
+    assert {status for status, _ in answers} == {200} and {body['source'] for _, body in answers} == {'ai'}
+    assert [status for status, _ in reads] == [200, 200]
+    assert read_seconds < stub.latency  # did not queue behind the Claude calls
+    assert stub.calls == 50
+
+
+def test_async_searches_are_recorded(stub, engine):
+    status, body = asyncio.run(asgi_request('POST', '/api/ai/disease', {'query': 'Async Recorded', 'session_id': 's9'}))
+    assert status == 200 and body['source'] == 'ai'
+    health.search_buffer.flush()
+    with health.app.app_context(), engine.session() as s:
+        rows = s.fetchall("SELECT session_id, query FROM search_history")
+    assert [(r['session_id'], r['query']) for r in rows] == [('s9', 'async recorded')]
+
+
+def test_identical_streams_share_one_call(stub):
+    async def scenario():
+        return await asyncio.gather(*(asgi_text('POST', '/api/ai/disease/stream', {'query': 'Async Stream'})
+                                      for _ in range(5)))
+
+    streams = [parse_sse(text) for _, text in asyncio.run(scenario())]
+    assert stub.calls == 1
+    assert sorted([name for name, _ in events] for events in streams) == [['delta', 'delta', 'result']] + [['result']] * 4
+    assert {events[-1][1]['source'] for events in streams} == {'ai'}
+
+
+def test_a_stream_failing_after_partial_text_ends_with_an_error_event(stub):
+    stub.fail_at = 1
+    status, text = asyncio.run(asgi_text('POST', '/api/ai/disease/stream', {'query': 'async cut off'}))
+    assert status == 200 and [name for name, _ in parse_sse(text)] == ['delta', 'error']
+
+
+def test_a_retried_async_search_is_not_recorded_again(stub, engine):
+    status, body = asyncio.run(asgi_request('POST', '/api/ai/disease', {'query': 'Async Retry', 'session_id': 's9',
+                                                                         'record': False}))
+    assert status == 200 and body['source'] == 'ai'
+    health.search_buffer.flush()
+    with health.app.app_context(), engine.session() as s:
+        assert s.fetchall("SELECT query FROM search_history") == []
+
+
+def test_a_slow_bridged_route_does_not_block_the_others(client, monkeypatch):
+    release = threading.Event()
+    cities = health.app.view_functions['get_cities']
+
+    def stuck_cities():
+        release.wait(10)  # stands in for any long-running Flask route
+        return cities()
+
+    monkeypatch.setitem(health.app.view_functions, 'get_cities', stuck_cities)
+
+    async def scenario():
+        stuck = asyncio.create_task(asgi_request('GET', '/api/cities'))
+        await asyncio.sleep(0.1)
+        try:
+            reads = await asyncio.wait_for(asyncio.gather(asgi_request('GET', '/api/schemes'),
+                                                          asgi_request('GET', '/api/hospitals?limit=5')), 2)
+        finally:
+            release.set()
+        return reads, await stuck
+
+    reads, (status, _) = asyncio.run(scenario())
+    assert [s for s, _ in reads] == [200, 200] and status == 200
+
+
+class EventStream:
+    """A GET held open against app.asgi_app; SSE events are read as they are sent"""
+
+    def __init__(self, path):
+        self.chunks, self.disconnect = asyncio.Queue(), asyncio.Event()
+        self.task = asyncio.create_task(health.asgi_app(http_scope('GET', path), self.receive, self.send))
+
+    async def receive(self):
+        if not hasattr(self, 'requested'):
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.body':
+            await self.chunks.put(message['body'].decode())
+
+    async def next_event(self, timeout=2):
+        """(event name, data) of the next event, skipping keep-alive comments"""
+        while True:
+            chunk = await asyncio.wait_for(self.chunks.get(), timeout)
+            if chunk.startswith('event: '):
+                name, data = chunk.split('\n')[:2]
+                return name[len('event: '):], json.loads(data[len('data: '):])
+
+    async def close(self):
+        self.disconnect.set()
+        await asyncio.wait_for(self.task, 2)
+
+
+def call_next(client, hospital_id):
+    return client.post(f'/api/queue/{hospital_id}/next', headers={'X-Staff-Key': 'test-staff-key'})
+
+
+def test_token_events_are_pushed_from_the_event_loop(client):
+    tokens = [client.post('/api/tokens', json={'hospital_id': 4, 'session_id': 's'}).get_json()['token']
+              for _ in range(3)]
+
+    async def scenario():
+        stream = EventStream(f'/api/tokens/{tokens[2]}/events')
+        seen = [await stream.next_event()]
+        for _ in range(3):
+            await asyncio.to_thread(call_next, client, 4)  # moves published from a worker thread
+            seen.append(await stream.next_event())
+        seen.append(await stream.next_event())
+        await asyncio.wait_for(stream.task, 2)
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert [(name, data.get('status')) for name, data in seen] == [
+        ('status', 'near'), ('status', 'near'), ('status', 'near'), ('status', 'your_turn'), ('end', None)]
+    assert [data['people_ahead'] for _, data in seen[:3]] == [2, 1, 0]
+    assert health.queue_broadcaster._subscribers == {}
+
+
+def test_open_token_streams_hold_no_threads(client, monkeypatch):
+    monkeypatch.setattr(health, '_wsgi_bridge', None)
+    monkeypatch.setitem(health.app.config, 'ASGI_THREADS', 2)
+    tokens = [client.post('/api/tokens', json={'hospital_id': 5, 'session_id': 's'}).get_json()['token']
+              for _ in range(12)]
+
+    async def scenario():
+        streams = [EventStream(f'/api/tokens/{t}/events') for t in tokens[2:]]  # more streams than bridge threads
+        for stream in streams:
+            await stream.next_event()
+        reads = await asyncio.wait_for(asyncio.gather(asgi_request('GET', '/api/schemes'),
+                                                      asgi_request('GET', '/api/hospitals?limit=5')), 2)
+        missing = await asgi_request('GET', '/api/tokens/H5-999/events')
+        for stream in streams:
+            await stream.close()  # client disconnects end the stream
+        return reads, missing
+
+    reads, missing = asyncio.run(scenario())
+    assert [s for s, _ in reads] == [200, 200] and missing[0] == 404
+    assert health.queue_broadcaster._subscribers == {}
+
+
+def test_lifespan_startup_starts_the_background_jobs(monkeypatch):
+    started = []
+    monkeypatch.setattr(health, 'start_background_jobs', lambda: started.append(True))
+    messages = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(health.asgi_app({'type': 'lifespan'}, receive, send))
+    assert started == [True] and sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
@@ -0,0 +1,88 @@
+"""Single-flight coalescing of identical AI queries"""
+import threading, time, types
+
+import pytest
+
+from conftest import health
+
+ANSWER = '{"title": "Stub", "description": "d", "dos": [], "donts": [], "food": [], "prevention": [], "specialist": "x", "emergency": false}'
+
+
+class StubClient:
+    api_key = 'test'
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        time.sleep(0.2)  # long enough for every request to arrive while the first call is in flight
+        return types.SimpleNamespace(content=[types.SimpleNamespace(text=ANSWER)])
+
+
+def run_together(n, fn):
+    threads = [threading.Thread(target=fn) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_followers_share_the_leaders_result():
+    flight, calls, results = health.SingleFlight(), [], []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'answer'
+
+    run_together(10, lambda: results.append(flight.do('k', slow)))
+    assert len(calls) == 1
+    assert results == ['answer'] * 10
+    assert flight.coalesced == 9
+
+
+def test_followers_see_the_leaders_error():
+    flight, errors = health.SingleFlight(), []
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError('upstream down')
+
+    def call():
+        with pytest.raises(RuntimeError):
+            flight.do('k', failing)
+        errors.append(1)
+
+    run_together(5, call)
+    assert len(errors) == 5
+    assert flight.do('k', lambda: 'recovered') == 'recovered'  # nothing left in flight
+
+
+def test_followers_stop_waiting_on_a_hung_leader():
+    flight, release, results = health.SingleFlight(timeout=0.1), threading.Event(), []
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', lambda: release.wait(5) and 'late')))
+    leader.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    assert flight.do('k', lambda: 'own call') == 'own call'
+    assert time.perf_counter() - started < 1 and flight.timed_out == 1
+    release.set()
+    leader.join()
+    assert results == ['late']
+
+
+def test_identical_requests_make_one_upstream_call(client, monkeypatch):
+    stub = StubClient()
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(health, 'get_anthropic_client', lambda api_key: stub)
+    sources = []
+
+    def ask():
+        r = health.app.test_client().post('/api/ai/disease', json={'query': ' Coalesce Fever '})
+        sources.append(r.get_json()['source'])
+
+    run_together(20, ask)
+    assert sources == ['ai'] * 20
+    assert stub.calls == 1
@@ -0,0 +1,158 @@
+"""The state repositories and the routes built on them, run against every engine in ENGINES"""
+import json, threading, time
+
+from conftest import health
+from test_coalescing import StubClient
+
+SIGNUP = {'name': 'Asha', 'mobile': '9876500001', 'password': 'secret123', 'confirm_password': 'secret123'}
+
+
+def test_register_login_and_duplicate(engine, client):
+    r = client.post('/api/register', json=SIGNUP)
+    assert r.status_code == 200
+    user_id = r.get_json()['user']['id']
+    assert client.post('/api/register', json=SIGNUP).status_code == 409
+
+    client.post('/api/logout')
+    assert client.get('/api/user').get_json()['user'] is None
+    assert client.post('/api/login', json={'mobile': SIGNUP['mobile'], 'password': 'wrong'}).status_code == 401
+    r = client.post('/api/login', json={'mobile': SIGNUP['mobile'], 'password': 'secret123'})
+    assert r.status_code == 200 and r.get_json()['user']['id'] == user_id
+
+
+def test_user_repository_rejects_duplicate_email(engine):
+    with health.app.app_context():
+        assert health.user_repo.create('A', 'a@mobile.local', 'h', '9000000001') is not None
+        assert health.user_repo.create('B', 'a@mobile.local', 'h', '9000000002') is None
+        assert health.user_repo.by_mobile('9000000001')['name'] == 'A'
+
+
+def test_concurrent_bookings_get_contiguous_tokens(engine, client):
+    tokens = []
+
+    def book():
+        tokens.append(health.app.test_client().post('/api/tokens', json={'hospital_id': 1, 'session_id': 's'}).get_json()['token'])
+
+    threads = [threading.Thread(target=book) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(int(t.split('-')[1]) for t in tokens) == list(range(1, 21))
+
+
+def test_call_next_moves_the_queue(engine, client):
+    first = client.post('/api/tokens', json={'hospital_id': 2, 'session_id': 's'}).get_json()['token']
+    second = client.post('/api/tokens', json={'hospital_id': 2, 'session_id': 's'}).get_json()['token']
+    assert client.post('/api/queue/2/next').status_code == 403
+    snap = client.post('/api/queue/2/next', headers={'X-Staff-Key': 'test-staff-key'}).get_json()
+    assert (snap['now_serving'], snap['last_issued']) == (1, 2)
+    assert client.get(f'/api/tokens/{first}/status').get_json()['status'] == 'your_turn'
+    assert client.get(f'/api/tokens/{second}/status').get_json()['status'] == 'near'
+    assert client.post('/api/queue/999999/next', headers={'X-Staff-Key': 'test-staff-key'}).status_code == 404
+
+
+def test_queue_state_survives_a_restart(engine, client):
+    for _ in range(3):
+        client.post('/api/tokens', json={'hospital_id': 3, 'session_id': 's'})
+    client.post('/api/queue/3/next', headers={'X-Staff-Key': 'test-staff-key'})
+    fresh = health.QueueEngine(health.token_repo, 0, health.WaitEstimator(0.2), 0)
+    with health.app.app_context():
+        snap = fresh.snapshot(3)
+    assert (snap['now_serving'], snap['last_issued'], snap['waiting']) == (1, 3, 2)
+
+
+def test_workers_see_each_others_queue_moves(engine, client):
+    other = health.QueueEngine(health.token_repo, 0, health.WaitEstimator(0.2), 0)  # a second worker process
+    with health.app.app_context():
+        other.snapshot(6)
+        first = client.post('/api/tokens', json={'hospital_id': 6, 'session_id': 's'}).get_json()['token']
+        assert other.status(first)['status'] == 'near'  # issued by this worker, seen by the other
+        other.advance(6)
+        assert client.get(f'/api/tokens/{first}/status').get_json()['status'] == 'your_turn'
+
+
+def test_search_history_rolls_up_once(engine, client):
+    for query in ('Fever', 'fever ', 'asthma'):
+        client.post('/api/ai/disease', json={'query': query, 'session_id': 's1'})
+    health.search_buffer.flush()
+    with health.app.app_context():
+        assert health.search_analytics.rollup() == 3
+        assert health.search_analytics.rollup() == 0
+    trending = client.get('/api/trending?kind=disease').get_json()
+    counts = {r['query']: r['searches'] for r in trending}
+    assert counts == {'fever': 2, 'asthma': 1}
+
+
+def test_prewarm_fills_the_ai_fragment_and_detail_caches(engine, client, monkeypatch):
+    for query in ('fever', 'asthma'):
+        client.post('/api/ai/disease', json={'query': query, 'session_id': 's1'})
+    client.get('/api/hospitals?search=apollo&session_id=s1')
+    health.search_buffer.flush()
+    stub = StubClient()
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(health, 'get_anthropic_client', lambda api_key: stub)
+    monkeypatch.setattr(health, 'fragment_cache', health.FragmentCache(30, 16))
+    monkeypatch.setattr(health, 'detail_cache', health.HospitalDetailCache(health.hospital_repo, 30))
+    with health.app.app_context():
+        health.ai_cache.repo.put('fever', '{"title": "Stored"}', time.time(), 0)
+        monkeypatch.setattr(health, 'ai_cache', health.AIResponseCache(health.ai_cache.repo, 8, 3600))  # a fresh process
+        health.search_analytics.rollup()
+        report = health.search_analytics.prewarm()
+    assert health.ai_cache.peek('fever') == {'title': 'Stored'}  # stored answer loaded, no call
+    assert health.ai_cache.peek('asthma')['title'] == 'Stub' and stub.calls == 1  # fetched once
+    assert len(health.fragment_cache._entries) == 1
+    apollo = [h['id'] for h in client.get('/api/hospitals?search=apollo').get_json()]
+    assert apollo and all(health.detail_cache.fresh(i) for i in apollo)
+    assert (report['ai_answers'], report['ai_fetched'], report['hospital_details']) == (2, 1, len(apollo))
+
+
+def test_retention_purges_old_rows(engine, client, monkeypatch):
+    old = time.time() - 400 * 86400
+    with health.app.app_context():
+        health.history_repo.add_many([('s', 'old', old, 'disease', None), ('s', 'new', time.time(), 'disease', None)])
+        health.search_analytics.rollup()
+        monkeypatch.setitem(health.retention.days, 'search_history', 180)
+        health.retention.run_once()
+        with engine.session() as s:
+            left = [r['query'] for r in s.fetchall("SELECT query FROM search_history")]
+    assert left == ['new']
+
+
+def test_ai_answers_are_shared_between_nodes(engine, client):
+    with health.app.app_context():
+        health.ai_cache.set('fever', {'disease': 'Fever'})
+        other = health.AIResponseCache(health.ai_cache.repo, 8, 3600)  # another node's memory is empty
+        assert other.get('fever') == {'disease': 'Fever'} and other.db_hits == 1
+        assert other.warm(['fever', 'cough']) == 0  # already in memory
+        assert health.AIResponseCache(health.ai_cache.repo, 8, 3600).warm(['fever', 'cough']) == 1
+
+
+def test_catalogue_routes(engine, client):
+    detail = client.get('/api/hospitals/1')
+    assert detail.status_code == 200 and detail.get_json()['id'] == 1
+    assert client.get('/api/hospitals/1', headers={'If-None-Match': detail.headers['ETag']}).status_code == 304
+    ranked = client.post('/api/ai/recommend-hospitals', json={'disease': 'heart attack', 'k': 3}).get_json()
+    assert len(ranked) == 3 and all(r['reasons'] for r in ranked)
+
+
+def test_imports_reach_every_node(engine, client, tmp_path, monkeypatch):
+    registry = tmp_path / 'registry.jsonl'
+    registry.write_text(json.dumps({'name': 'Replica General', 'city': 'Nellore', 'rating': 4.2, 'beds': 90}) + '\n')
+    result = health.app.test_cli_runner().invoke(args=['import-data', str(registry), '--kind', 'hospitals'])
+    assert result.exit_code == 0, result.output
+    listed = client.get('/api/hospitals?city=Nellore').get_json()
+    assert [h['name'] for h in listed] == ['Replica General']
+    if not engine.shared:
+        return
+
+    # A second node with its own SQLite catalogue catches up from the shared log
+    monkeypatch.setitem(health.app.config, 'DATABASE', str(tmp_path / 'node-b.db'))
+    health.init_db()
+    try:
+        with health.app.app_context():
+            assert health.catalog_replica.sync() == {'entries': 1, 'imported': 1, 'skipped': 0}
+            assert health.catalog_replica.sync()['entries'] == 0
+        assert client.get('/api/hospitals?city=Nellore').get_json() == listed
+    finally:
+        health.db_pool.close_all(health.app.config['DATABASE'])
@@ -0,0 +1,75 @@
+"""KeywordIndex matching rules, checked against a brute-force scan, and the knowledge lookups built on it"""
+import random
+
+from conftest import health
+
+
+def index_of(*terms, **kwargs):
+    index = health.KeywordIndex(**kwargs)
+    for rank, term in enumerate(terms):
+        index.add(term, term, rank)
+    return index
+
+
+def test_terms_match_at_word_starts_only():
+    index = index_of('fever', 'chest pain')
+    assert index.ranked('high feverish night') == ['fever']
+    assert index.ranked('antifever tablets') == []
+    assert index.ranked('Chest  PAIN since morning') == ['chest pain']
+
+
+def test_short_terms_must_be_whole_words():
+    index = index_of('bp')
+    assert index.ranked('my bp is high') == ['bp']
+    assert index.ranked('bpx') == []
+
+
+def test_prefix_of_a_term_needs_min_prefix_letters():
+    assert index_of('diabetes').ranked('diab') == ['diabetes']
+    assert index_of('diabetes').ranked('di') == []
+    assert index_of('diabetes', min_prefix=1).ranked('di') == ['diabetes']
+
+
+def test_every_hit_is_found_in_one_pass_and_ranked():
+    index = health.KeywordIndex()
+    index.add('fever', 'fever', rank=5)
+    index.add('chest pain', 'emergency', rank=0)
+    index.add('cough', 'cough', rank=2)
+    assert index.ranked('cough, fever and chest pain') == ['emergency', 'cough', 'fever']
+    assert index.best('cough, fever and chest pain') == 'emergency'
+
+
+def brute_force(terms, text):
+    """The documented rules, one term at a time"""
+    words = health.keyword_words(text)
+    hits = set()
+    for term in terms:
+        parts = term.split()
+        for start in range(len(words) - len(parts) + 1):
+            window = words[start:start + len(parts)]
+            last_ok = window[-1] == parts[-1] if len(parts[-1]) < 3 else window[-1].startswith(parts[-1])
+            if window[:-1] == parts[:-1] and last_ok:
+                hits.add(term)
+    return hits
+
+
+def test_agrees_with_brute_force_on_a_random_vocabulary():
+    rng = random.Random(7)
+    word = lambda: ''.join(rng.choice('abcdefgh') for _ in range(rng.randint(2, 6)))
+    terms = sorted({' '.join(word() for _ in range(rng.randint(1, 2))) for _ in range(500)})
+    index = index_of(*terms)
+    for _ in range(300):
+        text = ' '.join(rng.choice(terms) if rng.random() < 0.3 else word() for _ in range(rng.randint(1, 6)))
+        prefix_hits = {t for t in terms if len(' '.join(health.keyword_words(text))) >= 3 and t.startswith(text)}
+        assert set(index.ranked(text)) == brute_force(terms, text) | prefix_hits, text
+
+
+def test_disease_lookup_keeps_short_prefixes():
+    assert health.KNOWLEDGE.find_disease('di')['title'] == health.KNOWLEDGE.diseases['diabetes']['title']
+    assert health.KNOWLEDGE.find_disease('xyz') is None
+
+
+def test_emergencies_rank_first():
+    assert health.KNOWLEDGE.match_conditions('i have diabetes and heart pain') == ['heart', 'diabetes']
+    intents = health.KNOWLEDGE.match_intents('fever and chest pain')
+    assert [intent['terms'][0] for intent in intents] == ['chest pain', 'fever']
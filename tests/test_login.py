@@ -0,0 +1,104 @@
+"""Login rate limiting and the off-thread password hasher"""
+import os, subprocess, sys
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from conftest import ROOT, health
+
+SIGNUP = {'name': 'Ravi', 'mobile': '9876500002', 'password': 'secret123', 'confirm_password': 'secret123'}
+
+
+def test_bucket_allows_a_burst_then_asks_callers_to_wait():
+    limiter = health.TokenBucketLimiter(3, per=60)
+    assert [limiter.take('k') for _ in range(3)] == [0, 0, 0]
+    wait = limiter.take('k')
+    assert 0 < wait <= 20
+    assert limiter.take('other') == 0
+    assert limiter.limited == 1
+
+
+def test_bucket_keeps_at_most_max_keys():
+    limiter = health.TokenBucketLimiter(1, max_keys=10)
+    for i in range(50):
+        limiter.take(i)
+    assert len(limiter._buckets) == 10
+
+
+def test_login_is_rate_limited_per_mobile(client, monkeypatch):
+    client.post('/api/register', json=SIGNUP)
+    monkeypatch.setattr(health, 'login_mobile_limiter', health.TokenBucketLimiter(2))
+    attempt = {'mobile': SIGNUP['mobile'], 'password': 'wrong'}
+    assert [client.post('/api/login', json=attempt).status_code for _ in range(2)] == [401, 401]
+    r = client.post('/api/login', json=attempt)
+    assert r.status_code == 429 and int(r.headers['Retry-After']) >= 1
+    other = dict(attempt, mobile='9876500003')
+    assert client.post('/api/login', json=other).status_code == 401  # other numbers are unaffected
+
+
+def run_app(tmp_path, code, **env):
+    """stdout of `code` run in a fresh interpreter that imports app.py with `env` set"""
+    env = {**os.environ, 'DATABASE': str(tmp_path / 'fresh.db'), 'BACKGROUND_JOBS': '1', **env}
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_forwarded_for_is_ignored_unless_proxies_are_trusted(client, monkeypatch):
+    monkeypatch.setattr(health, 'login_ip_limiter', health.TokenBucketLimiter(1))
+    statuses = [client.post('/api/login', json={}, headers={'X-Forwarded-For': ip}).status_code
+                for ip in ('10.0.0.1', '10.0.0.2')]
+    assert statuses == [400, 429]  # a forged header doesn't buy a fresh bucket
+
+
+def test_trusted_proxies_key_the_limit_on_the_forwarded_client(tmp_path):
+    out = run_app(tmp_path, """
+import app
+client = app.app.test_client()
+print([client.post('/api/login', json={}, headers={'X-Forwarded-For': ip}).status_code
+       for ip in ('10.0.0.1', '10.0.0.1', '10.0.0.2')])
+""", TRUSTED_PROXIES='1', LOGIN_IP_PER_MINUTE='1', BACKGROUND_JOBS='0')
+    assert out.strip() == '[400, 429, 400]'
+
+
+def test_reimporting_as_mp_main_has_no_side_effects(tmp_path):
+    # what a spawned hashing worker does when the server was started with `python app.py`
+    out = run_app(tmp_path, """
+import os, runpy, threading
+runpy.run_path('app.py', run_name='__mp_main__')
+print(os.path.exists(os.environ['DATABASE']), sorted(t.name for t in threading.enumerate()))
+""")
+    assert out.strip() == "False ['MainThread']"
+
+
+@pytest.fixture
+def pooled_hasher():
+    hasher = health.PasswordHasher(1, 4)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_pooled_hasher_round_trip(pooled_hasher):
+    password_hash = pooled_hasher.hash('secret123')
+    assert pooled_hasher.verify(password_hash, 'secret123')
+    assert not pooled_hasher.verify(password_hash, 'wrong')
+
+
+def test_slow_hash_is_a_503_with_retry_after(client, monkeypatch, pooled_hasher):
+    pooled_hasher.timeout = 0.001
+    monkeypatch.setattr(health, 'password_hasher', pooled_hasher)
+    r = client.post('/api/register', json=SIGNUP)
+    assert r.status_code == 503 and r.headers['Retry-After'] == '1'
+    assert pooled_hasher.rejected == 1
+
+
+def test_a_broken_pool_is_shut_down_and_replaced(pooled_hasher):
+    pooled_hasher.hash('warm-up')
+    broken = pooled_hasher._executor
+    for worker in list(broken._processes.values()):
+        worker.kill()
+        worker.join()
+    with pytest.raises(BrokenProcessPool):
+        pooled_hasher.hash('secret123')
+    assert broken._processes is None  # shut down, not just dropped
+    assert pooled_hasher.verify(pooled_hasher.hash('secret123'), 'secret123')
+    assert pooled_hasher._executor is not broken
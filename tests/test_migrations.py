@@ -0,0 +1,108 @@
+"""Versioned schema migrations and the boot-time version check"""
+import os, sqlite3, subprocess, sys, threading
+
+import pytest
+
+from conftest import ROOT, health
+
+
+@pytest.fixture
+def empty_database(tmp_path, monkeypatch):
+    path = str(tmp_path / 'new.db')
+    monkeypatch.setitem(health.app.config, 'DATABASE', path)
+    return path
+
+
+def versions(path):
+    db = sqlite3.connect(path)
+    try:
+        return [r[0] for r in db.execute("SELECT version FROM schema_version ORDER BY version")]
+    finally:
+        db.close()
+
+
+def test_migrations_apply_once_in_order(empty_database):
+    assert health.migrate_db() == [v for v, _ in health.MIGRATIONS]
+    assert health.migrate_db() == []
+    assert versions(empty_database) == list(range(1, health.SCHEMA_VERSION + 1))
+
+
+def test_baseline_merges_duplicate_natural_keys(empty_database):
+    health.migrate_db()
+    db = sqlite3.connect(empty_database)
+    db.executescript("""
+        -- a database from before the natural-key indexes
+        DROP INDEX ux_hospitals_name_city;
+        DROP INDEX ux_specialists_hospital_name;
+        DROP INDEX ux_departments_hospital_name;
+        DROP INDEX ux_schemes_hospital_name;
+        DELETE FROM schema_version;
+        INSERT INTO hospitals (id, name, city) VALUES (1, 'Twin', 'Guntur'), (2, 'Twin', 'Guntur'), (3, 'Solo', 'Guntur');
+        INSERT INTO specialists (id, hospital_id, name) VALUES (1, 1, 'Dr A'), (2, 2, 'Dr A'), (3, 2, 'Dr B');
+        INSERT INTO departments (id, hospital_id, name) VALUES (1, 1, 'ICU'), (2, 1, 'ICU');
+        INSERT INTO schemes (id, hospital_id, scheme_name) VALUES (1, 2, 'PMJAY'), (2, 2, 'PMJAY');
+        INSERT INTO tokens (token_number, hospital_id) VALUES ('T-1', 2);
+    """)
+    db.close()
+    assert health.migrate_db() == [v for v, _ in health.MIGRATIONS]
+    db = sqlite3.connect(empty_database)
+    try:
+        assert db.execute("SELECT id FROM hospitals ORDER BY id").fetchall() == [(1,), (3,)]
+        assert db.execute("SELECT id, hospital_id, name FROM specialists ORDER BY id").fetchall() == [(1, 1, 'Dr A'), (3, 1, 'Dr B')]
+        assert db.execute("SELECT id FROM departments").fetchall() == [(1,)]
+        assert db.execute("SELECT id, hospital_id FROM schemes").fetchall() == [(1, 1)]
+        assert db.execute("SELECT hospital_id FROM tokens").fetchall() == [(1,)]
+        assert db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'ux_%'").fetchone()[0] == 4
+    finally:
+        db.close()
+
+
+def test_concurrent_migrations_apply_each_version_once(empty_database):
+    applied, errors = [], []
+
+    def migrate():
+        try:
+            applied.extend(health.migrate_db())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert sorted(applied) == [v for v, _ in health.MIGRATIONS]
+    assert versions(empty_database) == list(range(1, health.SCHEMA_VERSION + 1))
+
+
+def test_boot_check_skips_work_on_a_current_database(database, monkeypatch):
+    monkeypatch.setattr(health, 'init_db', lambda: pytest.fail('a current database must not be migrated at boot'))
+    health.ensure_schema()
+
+
+def test_boot_check_migrates_a_new_database(empty_database):
+    health.ensure_schema()
+    assert versions(empty_database)[-1] == health.SCHEMA_VERSION
+    db = sqlite3.connect(empty_database)
+    assert db.execute("SELECT COUNT(*) FROM hospitals").fetchone()[0] > 0  # seeded too
+    db.close()
+
+
+def test_boot_check_leaves_migration_to_the_cli_when_auto_migrate_is_off(empty_database, monkeypatch):
+    monkeypatch.setitem(health.app.config, 'AUTO_MIGRATE', False)
+    health.ensure_schema()
+    db = sqlite3.connect(empty_database)
+    assert health.schema_version(db) == 0
+    db.close()
+    result = health.app.test_cli_runner().invoke(args=['migrate'])
+    assert result.exit_code == 0 and 'Applied migrations' in result.output
+    assert versions(empty_database)[-1] == health.SCHEMA_VERSION
+
+
+
+def test_background_jobs_start_at_boot_without_a_request(tmp_path):
+    env = dict(os.environ, DATABASE=str(tmp_path / 'boot.db'), BACKGROUND_JOBS='1')
+    out = subprocess.run([sys.executable, '-c', 'import app, threading; print([t.name for t in threading.enumerate()])'],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    assert 'search-analytics' in out and 'retention' in out
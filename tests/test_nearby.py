@@ -0,0 +1,52 @@
+"""Nearest-hospital search over the R*Tree index"""
+import random
+
+import pytest
+
+from conftest import health
+
+
+@pytest.fixture
+def scattered(database):
+    """2,000 extra hospitals spread over south India, kept in sync with hospital_geo by the triggers"""
+    rng = random.Random(15)
+    rows = [(f"Geo {i}", 'Geo', rng.uniform(10, 20), rng.uniform(74, 84), int(rng.random() < 0.3)) for i in range(2000)]
+    with health.app.app_context():
+        db = health.get_db()
+        db.executemany("INSERT INTO hospitals (name, city, lat, lng, emergency) VALUES (?,?,?,?,?)", rows)
+        db.commit()
+        yield db
+
+
+def brute_force(db, lat, lng, k, emergency_only=False):
+    rows = db.execute("SELECT id, lat, lng, emergency FROM hospitals WHERE lat IS NOT NULL").fetchall()
+    return [r['id'] for _, r in sorted(((health.haversine_km(lat, lng, r['lat'], r['lng']), r) for r in rows
+                                        if r['emergency'] or not emergency_only), key=lambda h: h[0])[:k]]
+
+
+@pytest.mark.parametrize('emergency_only', [False, True])
+def test_matches_a_brute_force_scan(scattered, emergency_only):
+    rng = random.Random(1)
+    filters = ' AND hospitals.emergency = 1' if emergency_only else ''
+    for _ in range(25):
+        lat, lng = rng.uniform(11, 19), rng.uniform(75, 83)
+        hits = health.nearest_hospitals(scattered, lat, lng, 5, filters, (), 1000)
+        assert [r['id'] for _, r in hits] == brute_force(scattered, lat, lng, 5, emergency_only)
+
+
+def test_max_km_bounds_the_search(scattered):
+    hits = health.nearest_hospitals(scattered, 0.0, 0.0, 5, '', (), 100)
+    assert hits == []
+
+
+def test_nearby_endpoint(client):
+    hits = client.get('/api/hospitals/nearby?lat=17.43&lng=78.45&k=3&emergency=1').get_json()
+    assert len(hits) == 3
+    assert all(h['emergency'] for h in hits)
+    distances = [h['distance_km'] for h in hits]
+    assert distances == sorted(distances) and distances[0] < 10
+
+
+@pytest.mark.parametrize('query', ['lng=78.4', 'lat=abc&lng=78.4', 'lat=91&lng=78.4', 'lat=nan&lng=78.4'])
+def test_nearby_rejects_bad_coordinates(client, query):
+    assert client.get(f'/api/hospitals/nearby?{query}').status_code == 400
@@ -0,0 +1,37 @@
+"""Keyset pagination of /api/hospitals, walked page by page"""
+import pytest
+
+from conftest import health
+
+
+@pytest.fixture
+def unrated(client):
+    """Hospitals without a rating, which must page like any other row"""
+    with health.app.app_context():
+        db = health.get_db()
+        db.executemany("INSERT INTO hospitals (name, city, rating, specialization) VALUES (?, 'Hyderabad', NULL, ?)",
+                       [(f'Unrated Clinic {i}', 'Cardiology') for i in range(3)])
+        db.commit()
+    return client
+
+
+def walk(client, query):
+    pages, cursor = [], None
+    while True:
+        r = client.get(f'/api/hospitals?limit=2&fields=id,name,rating&{query}' + (f'&cursor={cursor}' if cursor else ''))
+        assert r.status_code == 200
+        pages.append(r.get_json())
+        cursor = r.headers.get('X-Next-Cursor')
+        if not cursor:
+            return [h for page in pages for h in page]
+
+
+@pytest.mark.parametrize('search, city', [('', ''), ('', 'Hyderabad'), ('clinic', ''), ('cardiology', 'Hyderabad')])
+def test_every_row_appears_once_including_unrated(unrated, search, city):
+    with health.app.app_context():  # the whole result as one page, no cursor involved
+        everything = health.hospital_repo.page(['id', 'rating'], health.fts_query(search), search, city=city, limit=10000)
+    assert any(h['rating'] is None for h in everything)
+    walked = walk(unrated, f'search={search}&city={city}')
+    assert [h['id'] for h in walked] == [h['id'] for h in everything]
+    if not search:
+        assert [h['rating'] or 0 for h in walked] == sorted((h['rating'] or 0 for h in walked), reverse=True)
@@ -0,0 +1,47 @@
+"""SQLite ConnectionPool: reuse, idle cap, cleanup on release, pragmas"""
+from conftest import health
+
+
+def test_connections_are_reused(database):
+    pool = health.ConnectionPool(max_idle=2)
+    first = pool.acquire(database)
+    pool.release(database, first)
+    assert pool.acquire(database) is first
+    assert pool.opened == 1
+
+
+def test_idle_connections_are_capped(database):
+    pool = health.ConnectionPool(max_idle=2)
+    conns = [pool.acquire(database) for _ in range(4)]
+    for db in conns:
+        pool.release(database, db)
+    assert len(pool._idle[database]) == 2
+    pool.close_all(database)
+    assert database not in pool._idle
+
+
+def test_release_rolls_back_an_open_transaction(database):
+    pool = health.ConnectionPool(max_idle=1)
+    db = pool.acquire(database)
+    db.execute("BEGIN")
+    db.execute("DELETE FROM schemes")
+    pool.release(database, db)
+    db = pool.acquire(database)
+    assert not db.in_transaction
+    assert db.execute("SELECT COUNT(*) FROM schemes").fetchone()[0] > 0
+
+
+def test_pragmas(database):
+    pool = health.ConnectionPool()
+    db = pool.acquire(database)
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert db.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    pool.close_all()
+
+
+def test_requests_share_pooled_connections(client):
+    opened = health.db_pool.opened
+    for i in range(50):
+        client.get(f'/api/hospitals/{1 + i % 5}')
+        client.post('/api/tokens', json={'hospital_id': 1, 'session_id': 'pool'})
+    assert health.db_pool.opened - opened <= 1
@@ -0,0 +1,28 @@
+"""Query-plan regression: no statement the routes issue may fall back to a full table scan"""
+import sqlite3
+
+from conftest import health
+
+
+def test_routes_use_indexes():
+    before = dict(health.app.config)
+    result = health.app.test_cli_runner().invoke(args=['check-query-plans'])
+    assert result.exit_code == 0, result.output
+    assert 'Checked' in result.output and 'FULL SCAN' not in result.output
+    for key in ('DATABASE', 'BACKGROUND_JOBS'):
+        assert health.app.config[key] == before[key]  # the scratch run leaves the app as it found it
+    assert 'SQL_TRACE' not in health.app.config
+
+
+def test_unindexed_lookups_are_reported(database):
+    db = sqlite3.connect(database)
+    try:
+        problems = health.find_full_scans(db, [
+            "SELECT id FROM hospitals WHERE phone = '040'",          # no index on phone
+            "SELECT id FROM hospitals WHERE city = 'Hyderabad'",     # idx on (city, rating)
+            f"SELECT * FROM hospitals {health.WARM_UP}",             # deliberate whole-table load
+            "UPDATE hospitals SET phone = '040' WHERE id = 1",       # writes are not checked
+        ])  # as the trace callback records them: parameters already bound
+    finally:
+        db.close()
+    assert [sql for sql, _ in problems] == ["SELECT id FROM hospitals WHERE phone = '040'"]
@@ -0,0 +1,100 @@
+"""Server-sent-event routes served by Flask: chunked replies, coalescing and failure mid-answer"""
+import contextlib, json, time, types
+
+import pytest
+
+from conftest import health
+from test_coalescing import ANSWER, StubClient, run_together
+
+
+def parse_sse(text):
+    """[(event name, data)] of a complete SSE body"""
+    events = []
+    for raw in text.strip().split('\n\n'):
+        name, data = raw.split('\n')[:2]
+        events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+class StreamStubClient(StubClient):
+    """StubClient that also streams ANSWER in two pieces, optionally failing before piece `fail_at`"""
+
+    def __init__(self, fail_at=None):
+        super().__init__()
+        self.fail_at = fail_at
+
+    @contextlib.contextmanager
+    def stream(self, **kwargs):
+        self.calls += 1
+        yield types.SimpleNamespace(text_stream=self._pieces())
+
+    def _pieces(self):
+        for i, piece in enumerate((ANSWER[:40], ANSWER[40:])):
+            if i == self.fail_at:
+                raise RuntimeError('connection reset')
+            time.sleep(0.1)
+            yield piece
+
+
+@pytest.fixture
+def stub(client, monkeypatch):
+    stub = StreamStubClient()
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test')
+    monkeypatch.setattr(health, 'get_anthropic_client', lambda api_key: stub)
+    monkeypatch.setattr(health, 'ai_cache', health.AIResponseCache(health.ai_cache.repo, 8, 3600))  # nothing answered yet
+    return stub
+
+
+def stream(query, **body):
+    r = health.app.test_client().post('/api/ai/disease/stream', json=dict(body, query=query))
+    return parse_sse(r.get_data(as_text=True))
+
+
+def test_chat_reply_is_streamed_in_pieces(client):
+    events = parse_sse(client.post('/api/ai/chat/stream', json={'query': 'I have a headache'}).get_data(as_text=True))
+    deltas = [data['text'] for name, data in events if name == 'delta']
+    assert len(deltas) > 1 and ''.join(deltas) == events[-1][1]['reply']
+
+
+def test_streamed_answer_ends_with_the_parsed_result(stub):
+    events = stream('stream fever')
+    assert [name for name, _ in events] == ['delta', 'delta', 'result']
+    assert events[-1][1]['source'] == 'ai' and events[-1][1]['data']['title'] == 'Stub'
+
+
+def test_a_failure_after_partial_text_is_an_error_event(stub):
+    stub.fail_at = 1
+    events = stream('stream cut off')
+    assert [name for name, _ in events] == ['delta', 'error']  # not a mock answer under the partial one
+
+
+def test_a_failure_before_any_text_still_falls_back_to_mock(stub):
+    stub.fail_at = 0
+    assert [(name, data['source']) for name, data in stream('stream fever')] == [('result', 'mock')]
+
+
+def test_streams_and_plain_requests_share_one_call(stub):
+    results = []
+
+    def ask(n=iter(range(10))):
+        if next(n) % 2:
+            results.append(stream('Shared Fever')[-1][1]['source'])
+        else:
+            results.append(health.app.test_client().post('/api/ai/disease', json={'query': 'shared fever'})
+                           .get_json()['source'])
+
+    run_together(10, ask)
+    assert results == ['ai'] * 10
+    assert stub.calls == 1
+
+
+def test_a_retried_stream_search_is_recorded_once(stub, engine):
+    stub.fail_at = 1
+    assert stream('Retried Search', session_id='s7')[-1][0] == 'error'
+    retry = health.app.test_client().post('/api/ai/disease', json={'query': 'Retried Search', 'session_id': 's7',
+                                                                   'record': False})
+    assert retry.get_json()['source'] == 'ai'
+    health.search_buffer.flush()
+    with health.app.app_context(), engine.session() as s:
+        rows = s.fetchall("SELECT session_id, query FROM search_history")
+    assert [(r['session_id'], r['query']) for r in rows] == [('s7', 'retried search')]
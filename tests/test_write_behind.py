@@ -0,0 +1,64 @@
+"""WriteBehindBuffer retries, poison batches and backpressure (flushed by hand, no flusher thread timing)"""
+from conftest import health
+
+
+class Sink:
+    def __init__(self, failures=0, poison=()):
+        self.failures = failures
+        self.poison = set(poison)
+        self.written = []
+
+    def __call__(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('database down')
+        if self.poison.intersection(batch):
+            raise RuntimeError('constraint violated')
+        self.written.extend(batch)
+
+
+def buffer_for(sink, **kwargs):
+    buffer = health.WriteBehindBuffer(sink, interval=3600, **kwargs)
+    buffer._start()  # flusher thread idles for an hour; the test flushes
+    return buffer
+
+
+def test_transient_failures_are_retried_without_loss():
+    sink = Sink(failures=2)
+    buffer = buffer_for(sink, batch_size=10)
+    for event in 'abc':
+        buffer.put(event)
+    buffer.flush()
+    buffer.flush()
+    buffer.flush()
+    assert sink.written == ['a', 'b', 'c'] and buffer.dropped == 0
+
+
+def test_close_retries_a_failed_shutdown_flush():
+    sink = Sink(failures=1)
+    buffer = buffer_for(sink, batch_size=10)
+    for event in 'abc':
+        buffer.put(event)
+    buffer.CLOSE_BACKOFF = 0.01
+    buffer.close()
+    assert sink.written == ['a', 'b', 'c'] and buffer.dropped == 0 and buffer.flushed == 3
+
+
+def test_a_poison_event_is_dropped_after_max_attempts():
+    sink = Sink(poison={'bad'})
+    buffer = buffer_for(sink, batch_size=10, max_attempts=3)
+    for event in ['a', 'bad', 'c']:
+        buffer.put(event)
+    for _ in range(3):
+        buffer.flush()
+    assert sink.written == ['a', 'c'] and buffer.dropped == 1
+    buffer.put('d')
+    buffer.flush()
+    assert sink.written == ['a', 'c', 'd']
+
+
+def test_a_full_buffer_drops_new_events():
+    buffer = health.WriteBehindBuffer(Sink(), interval=3600, batch_size=100, max_size=2, block_seconds=0.01)
+    buffer._pid = health.os.getpid()  # no flusher thread: nothing makes room
+    assert [buffer.put(e) for e in 'abc'] == [True, True, False]
+    assert buffer.dropped == 1